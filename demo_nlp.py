@@ -1,12 +1,12 @@
 #!/usr/bin/env python
 """Demo script for GIS NLP Agent - try natural language queries."""
 
-import asyncio
+from concurrent.futures import ThreadPoolExecutor
 
 from src.gis_mcp_server.agents.gis_agent import GISAgent
 
 
-async def main() -> None:
+def main() -> None:
     """Run interactive NLP demo."""
     agent = GISAgent()
 
@@ -24,12 +24,14 @@ async def main() -> None:
     print("🚛 GIS MCP Server - Natural Language Interface Demo")
     print("=" * 70)
 
-    for query in example_queries:
+    # The queries are independent, so process them in parallel and print in order.
+    with ThreadPoolExecutor(max_workers=len(example_queries)) as executor:
+        results = list(executor.map(agent.process_request, example_queries))
+
+    for query, result in zip(example_queries, results):
         print(f"\n📍 Query: {query}")
         print("-" * 70)
 
-        result = await agent.process_request(query)
-
         if result["status"] == "success":
             print(f"✅ Status: {result['status']}")
             print(f"📊 Type: {result['type']}")
@@ -54,4 +56,4 @@ async def main() -> None:
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    main()
@@ -5,7 +5,6 @@ Run with: streamlit run demo_ui.py
 Opens at: http://localhost:8501
 """
 
-import asyncio
 import sys
 from pathlib import Path
 
@@ -76,8 +75,26 @@ st.markdown(
 # SESSION STATE
 # ============================================================================
 
-if "agent" not in st.session_state:
-    st.session_state.agent = GISAgent()
+@st.cache_resource
+def get_agent() -> GISAgent:
+    """One shared agent for all sessions.
+
+    The agent is read-only after init (its caches only grow), so sharing
+    it across browser sessions is safe and avoids re-running the distance
+    matrix precompute on every reconnect.
+    """
+    return GISAgent()
+
+
+@st.cache_data(ttl=3600, max_entries=512)
+def _cached_query(query: str) -> dict:
+    """Run a query through the agent, memoized on the query string.
+
+    Streamlit reruns the whole script on every widget interaction; caching
+    here means repeated identical queries skip the NLP parse and the
+    geodesic math entirely.
+    """
+    return get_agent().process_request(query)
 
 if "last_query" not in st.session_state:
     st.session_state.last_query = None
@@ -111,7 +128,8 @@ st.divider()
 # CITIES DATA
 # ============================================================================
 
-CITIES = [
+# Immutable so reruns share one object and cache keys hash cheaply.
+CITIES: tuple[str, ...] = (
     "New York",
     "Los Angeles",
     "Denver",
@@ -127,7 +145,7 @@ CITIES = [
     "Atlanta",
     "Boston",
     "Miami",
-]
+)
 
 # ============================================================================
 # TABS
@@ -174,7 +192,7 @@ with tab1:
         with st.spinner("Calculating..."):
             try:
                 query = f"distance from {origin} to {destination}"
-                result = asyncio.run(st.session_state.agent.process_request(query))
+                result = _cached_query(query)
 
                 if result["status"] == "success":
                     st.session_state.last_result = result
@@ -245,9 +263,7 @@ with tab2:
                 try:
                     stops_str = ", ".join(stops)
                     query = f"optimize route with stops in {stops_str}"
-                    result = asyncio.run(
-                        st.session_state.agent.process_request(query)
-                    )
+                    result = _cached_query(query)
 
                     if result["status"] == "success":
                         st.session_state.last_result = result
@@ -324,7 +340,7 @@ with tab3:
         with st.spinner("Calculating..."):
             try:
                 query = f"fuel cost for {distance} km at ${price} per liter"
-                result = asyncio.run(st.session_state.agent.process_request(query))
+                result = _cached_query(query)
 
                 if result["status"] == "success":
                     st.session_state.last_result = result
@@ -392,7 +408,7 @@ with tab4:
     if ask_button and query:
         with st.spinner("Processing query..."):
             try:
-                result = asyncio.run(st.session_state.agent.process_request(query))
+                result = _cached_query(query)
 
                 st.session_state.last_query = query
                 st.session_state.last_result = result
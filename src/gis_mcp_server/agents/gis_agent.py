@@ -1,10 +1,23 @@
 """GIS Agent for natural language processing of freight optimization requests."""
 
 import asyncio
+import hashlib
+import itertools
+import json
 import logging
+import os
 import re
+import sys
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
 from typing import Any, Optional
 
+import numpy as np
+from cachetools import LFUCache, cached
+
 from ..tools.distance_calculator import DistanceCalculator
 from ..tools.route_optimizer import RouteOptimizer
 
@@ -31,16 +44,167 @@ LOCATION_COORDINATES = {
     "atlanta": (33.7490, -84.3880),
     "boston": (42.3601, -71.0589),
     "miami": (25.7617, -80.1918),
+    "las vegas": (36.1699, -115.1398),
+    "vegas": (36.1699, -115.1398),
 }
 
+# Structure-of-arrays view of the table: hot-path callers resolve names to
+# row indices and slice _COORDS, keeping coordinates in NumPy instead of
+# boxing a Python tuple per lookup.
+_NAMES = list(LOCATION_COORDINATES)
+_COORDS = np.array(list(LOCATION_COORDINATES.values()), dtype=np.float64)
+# Interned keys make the dict probes identity-fast for literals
+_NAME_TO_IDX = {sys.intern(name): i for i, name in enumerate(_NAMES)}
+
+
+@lru_cache(maxsize=1024)
+def _resolve_index(location_name: str) -> Optional[int]:
+    """Resolve a location name to its row index in _COORDS, or None.
+
+    Memoized on the raw input; already-normalized names hit the table
+    directly without paying the lower()/strip() string allocations.
+    """
+    idx = _NAME_TO_IDX.get(location_name)
+    if idx is not None:
+        return idx
+    return _NAME_TO_IDX.get(location_name.lower().strip())
+
+
+_NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+
+# Parser patterns, compiled once at import instead of per query.
+# Pattern: "distance|far|how" ... "from" ... "to" / "between" ... "and"
+_DISTANCE_PATTERNS = [
+    re.compile(
+        r"(?:distance|how\s+far|calculate\s+(?:the\s+)?distance).*?from\s+(.+?)\s+to\s+(.+?)(?:\?|$)",
+        re.IGNORECASE,
+    ),
+    re.compile(r"(?:distance|far).*?between\s+(.+?)\s+and\s+(.+?)(?:\?|$)", re.IGNORECASE),
+]
+_ROUTE_PATTERN = re.compile(
+    r"(?:optimize|best|plan)\s+(?:a\s+)?route.*?(?:stops|visiting|through)\s+(.+?)(?:\?|$)",
+    re.IGNORECASE,
+)
+_COST_DISTANCE_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*km", re.IGNORECASE)
+_COST_PRICE_PATTERN = re.compile(r"\$?(\d+(?:\.\d+)?)\s*(?:per\s+)?liter", re.IGNORECASE)
+_COST_EFFICIENCY_PATTERN = re.compile(
+    r"(\d+(?:\.\d+)?)\s*km/liter|efficiency\s+of\s+(\d+(?:\.\d+)?)", re.IGNORECASE
+)
+# Split stop lists by comma or "and"
+_SPLIT_STOPS = re.compile(r",\s+and\s+|,\s+|\s+and\s+")
+
+# All intent triggers folded into one union pattern so classification is a
+# single scan of the query; the winning named group names the intent. This
+# runs against the numeric-templated query, hence "#" for numbers.
+_INTENT_PATTERN = re.compile(
+    r"(?P<route>(?:optimize|best|plan)\s+(?:a\s+)?route)"
+    r"|(?P<distance>distance|how\s+far)"
+    r"|(?P<cost>#\s*km)",
+    re.IGNORECASE,
+)
+
+
+def _template_query(query: str) -> str:
+    """Normalize a query and replace numeric literals with '#' placeholders."""
+    return _NUMBER_PATTERN.sub("#", query.strip().lower())
+
+
+@cached(LFUCache(maxsize=2048), lock=threading.Lock())
+def _classify_intent(template: str) -> Optional[str]:
+    """Classify a templated query into an intent name, memoized.
+
+    Queries that differ only in their numbers ("500 km" vs "800 km")
+    share one cache entry thanks to the templating. LFU eviction keeps
+    the recurring demo/preset queries resident even when the free-text
+    tab produces bursts of one-off entries.
+    """
+    match = _INTENT_PATTERN.search(template)
+    return match.lastgroup if match else None
+
+
+def _flush_query_cache(path: Path, cache: dict[str, dict[str, Any]]) -> None:
+    """Persist a query-result cache to disk, creating parent directories."""
+    if not cache:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+    except OSError as e:
+        logger.warning(f"Could not persist query cache: {e}")
+
 
 class GISAgent:
     """Natural language agent for GIS and freight optimization."""
 
-    def __init__(self) -> None:
-        """Initialize the GIS Agent."""
+    __slots__ = ("_cache_path", "_query_cache", "_pool", "_city_distances", "__weakref__")
+
+    def __init__(self, cache_path: Optional[str] = "cache/query_cache.json") -> None:
+        """
+        Initialize the GIS Agent.
+
+        Args:
+            cache_path: Location of the persistent query-result cache, or
+                None to keep the cache in memory only (e.g. for tests)
+        """
+        # Query results survive restarts: load the disk cache up front and
+        # flush it back out when the agent is collected or the process
+        # exits.
+        self._cache_path = Path(cache_path) if cache_path is not None else None
+        self._query_cache: dict[str, dict[str, Any]] = {}
+        if self._cache_path is not None:
+            try:
+                with open(self._cache_path, encoding="utf-8") as f:
+                    self._query_cache = json.load(f)
+            except (OSError, ValueError):
+                pass
+            # The finalizer closes over the path and cache dict only, so
+            # it doesn't pin the agent (or its thread pool) until exit.
+            weakref.finalize(self, _flush_query_cache, self._cache_path, self._query_cache)
+
+        # CPU-bound route solving runs in this pool so it never blocks the
+        # event loop serving other requests.
+        self._pool = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+        # Precompute the symmetric distance matrix for the known cities so
+        # distance queries between preset locations become O(1) lookups.
+        self._city_distances: dict[frozenset[str], float] = {}
+        for a, b in itertools.combinations(LOCATION_COORDINATES, 2):
+            self._city_distances[frozenset((a, b))] = DistanceCalculator.calculate_distance(
+                LOCATION_COORDINATES[a], LOCATION_COORDINATES[b]
+            )
         logger.info("GIS Agent initialized")
 
+    def _save_query_cache(self) -> None:
+        """Persist the query-result cache to disk."""
+        if self._cache_path is not None:
+            _flush_query_cache(self._cache_path, self._query_cache)
+
+    def _get_distance(self, origin_name: str, destination_name: str) -> float:
+        """
+        Distance in km between two resolved locations, via the precomputed
+        city matrix when both names are known presets.
+
+        Args:
+            origin_name: Normalized origin location name
+            destination_name: Normalized destination location name
+
+        Returns:
+            Distance in kilometers
+        """
+        a = origin_name.lower().strip()
+        b = destination_name.lower().strip()
+        if a == b:
+            return 0.0
+        cached = self._city_distances.get(frozenset((a, b)))
+        if cached is not None:
+            return cached
+        origin = self._resolve_location(a)
+        destination = self._resolve_location(b)
+        if origin is None or destination is None:
+            raise ValueError(f"Unknown location(s): {origin_name}, {destination_name}")
+        return DistanceCalculator.calculate_distance(origin, destination)
+
     def _resolve_location(self, location_name: str) -> Optional[tuple[float, float]]:
         """
         Resolve location name to coordinates.
@@ -51,8 +215,10 @@ class GISAgent:
         Returns:
             Tuple of (latitude, longitude) or None if not found
         """
-        normalized = location_name.lower().strip()
-        return LOCATION_COORDINATES.get(normalized)
+        idx = _resolve_index(location_name)
+        if idx is None:
+            return None
+        return (float(_COORDS[idx, 0]), float(_COORDS[idx, 1]))
 
     def _parse_distance_query(self, query: str) -> Optional[dict[str, Any]]:
         """
@@ -63,14 +229,8 @@ class GISAgent:
             - "how far is it from New York to Los Angeles"
             - "calculate distance between Denver and Seattle"
         """
-        # Pattern: "distance|far|how" ... "from" ... "to"
-        patterns = [
-            r"(?:distance|how\s+far|calculate\s+(?:the\s+)?distance).*?from\s+(.+?)\s+to\s+(.+?)(?:\?|$)",
-            r"(?:distance|far).*?between\s+(.+?)\s+and\s+(.+?)(?:\?|$)",
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, query, re.IGNORECASE)
+        for pattern in _DISTANCE_PATTERNS:
+            match = pattern.search(query)
             if match:
                 origin_name = match.group(1).strip()
                 destination_name = match.group(2).strip()
@@ -98,26 +258,36 @@ class GISAgent:
             - "find the best route visiting New York, Chicago, and Los Angeles"
             - "plan a route through San Francisco, Las Vegas, and Los Angeles"
         """
-        pattern = r"(?:optimize|best|plan)\s+(?:a\s+)?route.*?(?:stops|visiting|through)\s+(.+?)(?:\?|$)"
-
-        match = re.search(pattern, query, re.IGNORECASE)
+        match = _ROUTE_PATTERN.search(query)
         if match:
             stops_str = match.group(1)
-            # Split by comma or "and"
-            stops_list = re.split(r",\s+and\s+|,\s+|\s+and\s+", stops_str)
-            stops_list = [s.strip() for s in stops_list if s.strip()]
-
-            locations = []
+            # Plain comma lists split in C; the regex only runs for queries
+            # that mix "and" into the separators.
+            if " and " not in stops_str:
+                stops_list = stops_str.split(",")
+            else:
+                stops_list = _SPLIT_STOPS.split(stops_str)
+            stops_list = [
+                stripped
+                for s in stops_list
+                if (stripped := s.strip().removeprefix("and ").removesuffix(" and"))
+            ]
+
+            # One pass builds both the names and the coordinates
+            names = []
+            coords = []
             for stop in stops_list:
                 coord = self._resolve_location(stop)
                 if coord:
-                    locations.append((stop, coord))
+                    names.append(stop)
+                    coords.append(coord)
 
-            if len(locations) >= 2:
+            if len(coords) >= 2:
                 return {
                     "type": "route",
-                    "stops": locations,
-                    "waypoints": [coord for _, coord in locations],
+                    "stops": list(zip(names, coords)),
+                    "stop_names": names,
+                    "waypoints": coords,
                 }
 
         return None
@@ -132,20 +302,17 @@ class GISAgent:
             - "how much fuel costs for 800 km at $2 per liter"
         """
         # Extract distance in km
-        distance_pattern = r"(\d+(?:\.\d+)?)\s*km"
-        distance_match = re.search(distance_pattern, query, re.IGNORECASE)
+        distance_match = _COST_DISTANCE_PATTERN.search(query)
 
         if distance_match:
             distance_km = float(distance_match.group(1))
 
             # Extract fuel price if provided
-            price_pattern = r"\$?(\d+(?:\.\d+)?)\s*(?:per\s+)?liter"
-            price_match = re.search(price_pattern, query, re.IGNORECASE)
+            price_match = _COST_PRICE_PATTERN.search(query)
             fuel_price = float(price_match.group(1)) if price_match else 1.5
 
             # Extract fuel efficiency if provided
-            efficiency_pattern = r"(\d+(?:\.\d+)?)\s*km/liter|efficiency\s+of\s+(\d+(?:\.\d+)?)"
-            efficiency_match = re.search(efficiency_pattern, query, re.IGNORECASE)
+            efficiency_match = _COST_EFFICIENCY_PATTERN.search(query)
             fuel_efficiency = (
                 float(efficiency_match.group(1) or efficiency_match.group(2))
                 if efficiency_match
@@ -161,7 +328,51 @@ class GISAgent:
 
         return None
 
-    async def process_request(self, natural_language_query: str) -> dict[str, Any]:
+    def _solve_route(self, waypoints: list[tuple[float, float]]) -> tuple[float, float]:
+        """
+        Optimize a route and total it up. CPU-bound; meant to run off-loop.
+
+        Args:
+            waypoints: List of (latitude, longitude) tuples
+
+        Returns:
+            Tuple of (total distance in km, estimated fuel cost)
+        """
+        # One pairwise matrix serves both the tour search and the final
+        # route total, halving the trig work.
+        coords = np.asarray(waypoints, dtype=np.float64)
+        distances = DistanceCalculator.pairwise_haversine_matrix(coords)
+        order = np.asarray(RouteOptimizer.optimize_waypoints_from_matrix(distances))
+        total_distance = float(distances[order[:-1], order[1:]].sum())
+        return total_distance, RouteOptimizer.estimate_fuel_cost(total_distance)
+
+    def _parse(self, query: str) -> Optional[dict[str, Any]]:
+        """
+        Parse a query into an intent structure.
+
+        Intent classification is memoized on the numeric-templated form of
+        the query; slot extraction then runs only the matching parser on
+        the original text instead of trying every pattern in sequence.
+        """
+        parsers = {
+            "distance": self._parse_distance_query,
+            "route": self._parse_route_query,
+            "cost": self._parse_cost_query,
+        }
+        intent = _classify_intent(_template_query(query))
+        if intent is not None:
+            parsed = parsers.pop(intent)(query)
+            if parsed is not None:
+                return parsed
+        # The trigger classification is heuristic (e.g. an unknown city can
+        # fail slot extraction), so fall back to the remaining parsers.
+        for parser in parsers.values():
+            parsed = parser(query)
+            if parsed is not None:
+                return parsed
+        return None
+
+    def process_request(self, natural_language_query: str) -> dict[str, Any]:
         """
         Process natural language queries for GIS operations.
 
@@ -171,16 +382,42 @@ class GISAgent:
         Returns:
             Dictionary with calculated results and explanations
         """
+        key = hashlib.sha1(natural_language_query.strip().lower().encode()).hexdigest()
+        cached = self._query_cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = self._process_request(natural_language_query)
+        if result.get("status") == "success":
+            self._query_cache[key] = result
+        return result
+
+    async def process_request_async(self, natural_language_query: str) -> dict[str, Any]:
+        """
+        Async wrapper around process_request for event-loop callers.
+
+        The whole pipeline is CPU-bound, so it runs in the agent's thread
+        pool rather than on the event loop.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            self._pool, self.process_request, natural_language_query
+        )
+
+    def _process_request(self, natural_language_query: str) -> dict[str, Any]:
+        """Parse and execute a query, bypassing the persistent cache."""
         logger.info(f"Processing query: {natural_language_query}")
 
-        # Try to parse as distance query
-        parsed = self._parse_distance_query(natural_language_query)
-        if parsed:
+        parsed = self._parse(natural_language_query)
+
+        if parsed and parsed["type"] == "distance":
             try:
-                distance = DistanceCalculator.calculate_distance(
-                    parsed["origin"], parsed["destination"], unit="km"
+                distance = self._get_distance(
+                    parsed["origin_name"], parsed["destination_name"]
                 )
-                travel_time = DistanceCalculator.estimate_travel_time(distance)
+                travel_hours = DistanceCalculator.estimate_travel_hours(distance)
+                # Format each float once and splice the strings
+                distance_str = f"{distance:.2f}"
+                hours_str = f"{travel_hours:.1f}"
                 return {
                     "status": "success",
                     "type": "distance",
@@ -189,45 +426,44 @@ class GISAgent:
                         "from": parsed["origin_name"],
                         "to": parsed["destination_name"],
                         "distance_km": round(distance, 2),
-                        "travel_hours": round(travel_time["hours"], 2),
-                        "explanation": f"The distance from {parsed['origin_name']} to {parsed['destination_name']} is {distance:.2f} km, which takes approximately {travel_time['hours']:.1f} hours at 80 km/h.",
+                        "travel_hours": round(travel_hours, 2),
+                        "explanation": f"The distance from {parsed['origin_name']} to {parsed['destination_name']} is {distance_str} km, which takes approximately {hours_str} hours at 80 km/h.",
                     },
                 }
             except Exception as e:
                 logger.error(f"Error calculating distance: {e}")
                 return {"status": "error", "query": natural_language_query, "error": str(e)}
 
-        # Try to parse as route query
-        parsed = self._parse_route_query(natural_language_query)
-        if parsed:
+        if parsed and parsed["type"] == "route":
             try:
-                optimized = RouteOptimizer.optimize_waypoints(parsed["waypoints"])
-                total_distance = DistanceCalculator.calculate_route_distance(optimized)
-                fuel_cost = RouteOptimizer.estimate_fuel_cost(total_distance)
+                total_distance, fuel_cost = self._solve_route(parsed["waypoints"])
+                stop_names = parsed["stop_names"]
+                stops_str = ", ".join(stop_names)
+                distance_str = f"{total_distance:.2f}"
+                cost_str = f"{fuel_cost:.2f}"
                 return {
                     "status": "success",
                     "type": "route",
                     "query": natural_language_query,
                     "result": {
-                        "stops": [stop for stop, _ in parsed["stops"]],
+                        "stops": stop_names,
                         "total_distance_km": round(total_distance, 2),
                         "estimated_fuel_cost": round(fuel_cost, 2),
-                        "explanation": f"Optimized route through {', '.join([s for s, _ in parsed['stops']])} is {total_distance:.2f} km with estimated fuel cost of ${fuel_cost:.2f}.",
+                        "explanation": f"Optimized route through {stops_str} is {distance_str} km with estimated fuel cost of ${cost_str}.",
                     },
                 }
             except Exception as e:
                 logger.error(f"Error optimizing route: {e}")
                 return {"status": "error", "query": natural_language_query, "error": str(e)}
 
-        # Try to parse as cost query
-        parsed = self._parse_cost_query(natural_language_query)
-        if parsed:
+        if parsed and parsed["type"] == "cost":
             try:
                 fuel_cost = RouteOptimizer.estimate_fuel_cost(
                     parsed["distance_km"],
                     parsed["fuel_price"],
                     parsed["fuel_efficiency"],
                 )
+                cost_str = f"{fuel_cost:.2f}"
                 return {
                     "status": "success",
                     "type": "cost",
@@ -237,7 +473,7 @@ class GISAgent:
                         "fuel_price_per_liter": parsed["fuel_price"],
                         "fuel_efficiency_km_per_liter": parsed["fuel_efficiency"],
                         "estimated_fuel_cost": round(fuel_cost, 2),
-                        "explanation": f"For a {parsed['distance_km']} km route at ${parsed['fuel_price']}/L with {parsed['fuel_efficiency']} km/L efficiency, fuel cost is ${fuel_cost:.2f}.",
+                        "explanation": f"For a {parsed['distance_km']} km route at ${parsed['fuel_price']}/L with {parsed['fuel_efficiency']} km/L efficiency, fuel cost is ${cost_str}.",
                     },
                 }
             except Exception as e:
@@ -275,29 +511,21 @@ class GISAgent:
         """
         logger.info(f"Calculating route from {origin} to {destination}")
 
-        # Resolve all locations
-        origin_coord = self._resolve_location(origin)
-        destination_coord = self._resolve_location(destination)
+        # Resolve every stop in one pass; _COORDS is sliced once below
+        candidates = [origin, *(waypoints or []), destination]
+        resolved = [(name, _resolve_index(name)) for name in candidates]
 
-        if not origin_coord or not destination_coord:
+        if resolved[0][1] is None or resolved[-1][1] is None:
             return {
                 "status": "error",
                 "message": f"Could not resolve location(s): {origin} or {destination}",
             }
 
-        # Build waypoint list
-        all_waypoints = [origin_coord]
-        waypoint_names = [origin]
-
-        if waypoints:
-            for wp in waypoints:
-                coord = self._resolve_location(wp)
-                if coord:
-                    all_waypoints.append(coord)
-                    waypoint_names.append(wp)
+        valid = [(name, idx) for name, idx in resolved if idx is not None]
+        waypoint_names = [name for name, _ in valid]
+        indices = [idx for _, idx in valid]
 
-        all_waypoints.append(destination_coord)
-        waypoint_names.append(destination)
+        all_waypoints = _COORDS[np.asarray(indices, dtype=np.intp)]
 
         if len(all_waypoints) < 2:
             return {
@@ -305,11 +533,12 @@ class GISAgent:
                 "message": "Not enough valid waypoints for route",
             }
 
-        # Optimize route
+        # Optimize route, reusing one pairwise matrix for tour and total
         try:
-            optimized = RouteOptimizer.optimize_waypoints(all_waypoints)
-            total_distance = DistanceCalculator.calculate_route_distance(optimized)
-            travel_time = DistanceCalculator.estimate_travel_time(total_distance)
+            distances = DistanceCalculator.pairwise_haversine_matrix(all_waypoints)
+            order = np.asarray(RouteOptimizer.optimize_waypoints_from_matrix(distances))
+            total_distance = float(distances[order[:-1], order[1:]].sum())
+            travel_hours = DistanceCalculator.estimate_travel_hours(total_distance)
             fuel_cost = RouteOptimizer.estimate_fuel_cost(total_distance)
 
             return {
@@ -318,7 +547,7 @@ class GISAgent:
                 "destination": destination,
                 "waypoints": waypoint_names,
                 "total_distance_km": round(total_distance, 2),
-                "travel_hours": round(travel_time["hours"], 2),
+                "travel_hours": round(travel_hours, 2),
                 "estimated_fuel_cost": round(fuel_cost, 2),
             }
         except Exception as e:
@@ -0,0 +1,149 @@
+"""Optional Numba-accelerated kernels for route optimization.
+
+Numba is an optional dependency: when it is installed the route optimizer
+dispatches its hot loops to the LLVM-compiled kernels below, otherwise it
+falls back to the pure-Python implementations in route_optimizer.
+"""
+
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit, prange
+
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# Mean Earth radius in kilometers (IUGG)
+_EARTH_RADIUS_KM = 6371.0088
+
+# Row-parallel matrix fill only pays off once there is enough work per
+# thread to amortize the fork/join; below this the serial kernel wins.
+_PARALLEL_THRESHOLD = 256
+
+if HAS_NUMBA:
+
+    @njit(cache=True, fastmath=True)
+    def _pairwise_haversine(lat: np.ndarray, lon: np.ndarray, out: np.ndarray) -> None:
+        """Fill `out` with pairwise haversine distances; inputs in radians."""
+        n = lat.shape[0]
+        for i in range(n):
+            out[i, i] = 0.0
+            for j in range(i + 1, n):
+                dlat = lat[j] - lat[i]
+                dlon = lon[j] - lon[i]
+                a = np.sin(dlat / 2) ** 2 + np.cos(lat[i]) * np.cos(lat[j]) * np.sin(dlon / 2) ** 2
+                d = 2.0 * _EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+                out[i, j] = d
+                out[j, i] = d
+
+    @njit(parallel=True, cache=True, fastmath=True)
+    def _pairwise_haversine_parallel(
+        lat: np.ndarray, lon: np.ndarray, out: np.ndarray
+    ) -> None:
+        """Row-parallel variant of the matrix fill for large N."""
+        n = lat.shape[0]
+        for i in prange(n):
+            out[i, i] = 0.0
+            for j in range(i + 1, n):
+                dlat = lat[j] - lat[i]
+                dlon = lon[j] - lon[i]
+                a = np.sin(dlat / 2) ** 2 + np.cos(lat[i]) * np.cos(lat[j]) * np.sin(dlon / 2) ** 2
+                d = 2.0 * _EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+                out[i, j] = d
+                out[j, i] = d
+
+    @njit(cache=True, fastmath=True)
+    def _nn_path(distances: np.ndarray, start_index: int) -> np.ndarray:
+        """Nearest-neighbor traversal over a distance matrix."""
+        n = distances.shape[0]
+        visited = np.zeros(n, dtype=np.bool_)
+        order = np.empty(n, dtype=np.int64)
+        order[0] = start_index
+        visited[start_index] = True
+        current = start_index
+        for step in range(1, n):
+            best = -1
+            best_distance = np.inf
+            for j in range(n):
+                if not visited[j] and distances[current, j] < best_distance:
+                    best_distance = distances[current, j]
+                    best = j
+            order[step] = best
+            visited[best] = True
+            current = best
+        return order
+
+    def pairwise_matrix(coords: np.ndarray) -> np.ndarray:
+        """JIT-compiled pairwise haversine matrix for (N, 2) degree coords."""
+        lat = np.radians(np.ascontiguousarray(coords[:, 0]))
+        lon = np.radians(np.ascontiguousarray(coords[:, 1]))
+        n = lat.shape[0]
+        out = np.empty((n, n), dtype=np.float64)
+        # The parallel variant is deliberately left out of warmup(): it
+        # compiles on the first large matrix, where the build already
+        # dwarfs the one-off compile cost.
+        if n >= _PARALLEL_THRESHOLD:
+            _pairwise_haversine_parallel(lat, lon, out)
+        else:
+            _pairwise_haversine(lat, lon, out)
+        return out
+
+    def nn_path(distances: np.ndarray, start_index: int = 0) -> list[int]:
+        """JIT-compiled nearest-neighbor visit order over a distance matrix."""
+        order = _nn_path(np.ascontiguousarray(distances, dtype=np.float64), start_index)
+        return [int(i) for i in order]
+
+    @njit(cache=True, fastmath=True)
+    def _two_opt(distances: np.ndarray, order: np.ndarray) -> np.ndarray:
+        """2-opt improvement over a tour, using the precomputed distance matrix."""
+        n = order.shape[0]
+        improved = True
+        while improved:
+            improved = False
+            for i in range(1, n - 2):
+                for j in range(i + 1, n - 1):
+                    a, b = order[i - 1], order[i]
+                    c, d = order[j], order[j + 1]
+                    if distances[a, c] + distances[b, d] < distances[a, b] + distances[c, d]:
+                        lo, hi = i, j
+                        while lo < hi:
+                            order[lo], order[hi] = order[hi], order[lo]
+                            lo += 1
+                            hi -= 1
+                        improved = True
+        return order
+
+    def two_opt(distances: np.ndarray, order: list[int]) -> list[int]:
+        """Run the JIT-compiled 2-opt pass and return the improved tour order.
+
+        The matrix is cast to float32 first: km-scale comparisons don't
+        need double precision and the half-size matrix keeps more of it
+        in cache across the kernel's quadratic sweeps.
+        """
+        result = _two_opt(
+            np.ascontiguousarray(distances, dtype=np.float32),
+            np.asarray(order, dtype=np.int64),
+        )
+        return [int(i) for i in result]
+
+    def warmup() -> None:
+        """Trigger JIT compilation once so the first real request doesn't pay for it."""
+        coords = np.zeros((3, 2), dtype=np.float64)
+        distances = pairwise_matrix(coords)
+        nn_path(distances)
+        two_opt(distances, [0, 1, 2])
+
+    try:
+        warmup()
+    except Exception:  # pragma: no cover - compilation issues shouldn't break import
+        logger.warning("Numba warmup failed; kernels will compile on first use")
+
+else:
+    pairwise_matrix = None  # type: ignore[assignment]
+    nn_path = None  # type: ignore[assignment]
+    two_opt = None  # type: ignore[assignment]
@@ -1,48 +1,513 @@
 """Route optimization tool for efficient freight delivery."""
 
+import atexit
+import json
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import combinations
+from pathlib import Path
 from typing import Optional
 
+import numpy as np
+
+from ._route_numba import nn_path as _nn_path_numba
+from ._route_numba import two_opt as _two_opt_numba
+from .distance_calculator import _EARTH_RADIUS_KM, DistanceCalculator
+
+try:
+    from ortools.constraint_solver import pywrapcp, routing_enums_pb2
+
+    HAS_ORTOOLS = True
+except ImportError:
+    HAS_ORTOOLS = False
+
+try:
+    from scipy.spatial import cKDTree
+
+    HAS_SCIPY = True
+except ImportError:
+    HAS_SCIPY = False
+
 logger = logging.getLogger(__name__)
 
+# Above this many waypoints the O(N^2) matrix build and scan start to
+# dominate; the KD-tree candidate path keeps construction ~O(N log N).
+_KDTREE_THRESHOLD = 512
+
+
+def fuel_cost(
+    distance_km: "float | np.ndarray",
+    fuel_price_per_liter: float = 1.5,
+    fuel_efficiency: float = 8.0,
+) -> np.ndarray:
+    """
+    Fuel cost as a single vectorized expression.
+
+    Accepts a scalar distance or an array of distances, so one code path
+    serves single queries and batched scenario sweeps alike.
+
+    Args:
+        distance_km: Distance(s) in kilometers
+        fuel_price_per_liter: Price per liter of fuel
+        fuel_efficiency: Vehicle fuel efficiency in km/liter
+
+    Returns:
+        Estimated fuel cost(s), same shape as the input
+    """
+    return np.asarray(distance_km, dtype=np.float64) / fuel_efficiency * fuel_price_per_liter
+
+
+def _ecef_unit(coords: np.ndarray) -> np.ndarray:
+    """Project (N, 2) degree coordinates onto the unit sphere as (N, 3)."""
+    lat = np.radians(coords[:, 0])
+    lon = np.radians(coords[:, 1])
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+def _kdtree_nn_order(coords: np.ndarray, start_index: int) -> list[int]:
+    """Nearest-neighbor tour built from KD-tree candidate queries.
+
+    Chord distance on the unit sphere is monotonic with great-circle
+    distance, so ranking candidates by the tree's Euclidean metric gives
+    the same nearest neighbor without an O(N) scan per step — and without
+    materializing the O(N^2) distance matrix at all.
+    """
+    ecef = _ecef_unit(coords)
+    tree = cKDTree(ecef)
+    n = coords.shape[0]
+
+    visited = np.zeros(n, dtype=bool)
+    order = [start_index]
+    visited[start_index] = True
+    current = start_index
+
+    for _ in range(n - 1):
+        k = min(20, n)
+        nearest = -1
+        while nearest < 0:
+            _, candidates = tree.query(ecef[current], k=k)
+            for j in np.atleast_1d(candidates):
+                if not visited[j]:
+                    nearest = int(j)
+                    break
+            else:
+                if k >= n:
+                    # Every point visited except stragglers the widened
+                    # query somehow missed; finish with a masked scan.
+                    nearest = int(np.flatnonzero(~visited)[0])
+                    break
+                k = min(k * 2, n)
+        order.append(nearest)
+        visited[nearest] = True
+        current = nearest
+    return order
+
+
+def _equirect_matrix(coords: np.ndarray) -> np.ndarray:
+    """Pairwise equirectangular distance matrix in kilometers.
+
+    A flat-earth projection around each pair's mean latitude: a handful
+    of FLOPs per pair and no inverse trig. Distances drift from the
+    great circle at continental spans, but the ranking stays close
+    enough for nearest-neighbor and 2-opt decisions, which only compare
+    distances. Reported totals should come from the haversine/geodesic
+    paths in DistanceCalculator.
+    """
+    lat = np.radians(coords[:, 0])
+    lon = np.radians(coords[:, 1])
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    mean_cos = np.cos((lat[:, None] + lat[None, :]) / 2)
+    return _EARTH_RADIUS_KM * np.sqrt((dlon * mean_cos) ** 2 + dlat**2)
+
+
+# Set this env var to a file path to persist geodesic pair distances
+# across processes; a fleet's waypoint universe then pays each Vincenty
+# solve exactly once, ever.
+_PAIR_CACHE_ENV = "GIS_MCP_PAIR_CACHE"
+_disk_cache: Optional[dict[str, float]] = None
+_disk_cache_dirty = False
+
+_geodesic = None
+
+
+def _get_geodesic():
+    """Return geopy's geodesic, importing it on first use.
+
+    Keeps geopy off the module import path (the default haversine
+    pipeline never needs it) while avoiding a sys.modules lookup inside
+    every cache-missing _pair_km call.
+    """
+    global _geodesic
+    if _geodesic is None:
+        from geopy.distance import geodesic as _geodesic_fn
+
+        _geodesic = _geodesic_fn
+    return _geodesic
+
+
+def _load_disk_cache(path: str) -> dict[str, float]:
+    global _disk_cache
+    if _disk_cache is None:
+        try:
+            with open(path) as f:
+                _disk_cache = json.load(f)
+        except (OSError, ValueError):
+            _disk_cache = {}
+        atexit.register(_save_disk_cache)
+    return _disk_cache
+
+
+def _save_disk_cache() -> None:
+    if not _disk_cache_dirty or _disk_cache is None:
+        return
+    path = os.environ.get(_PAIR_CACHE_ENV)
+    if not path:
+        return
+    try:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(_disk_cache, f)
+    except OSError as e:
+        logger.warning(f"Could not save pair cache: {e}")
+
+
+@lru_cache(maxsize=4096)
+def _pair_km(p: tuple[float, float], q: tuple[float, float]) -> float:
+    """Memoized geodesic distance for a canonicalized coordinate pair.
+
+    Callers must order the pair (p <= q) so both directions of a
+    symmetric lookup hit the same cache entry. Freight workloads revisit
+    the same city pairs constantly, so after warmup the geodesic cost of
+    repeated pairs drops to a dict probe. Use _pair_km.cache_clear() for
+    test isolation.
+
+    When GIS_MCP_PAIR_CACHE names a file, misses also consult a JSON
+    disk cache keyed by coordinates rounded to 5 decimals (~1 m), so
+    sub-meter-equivalent points coalesce and the cache survives process
+    restarts.
+    """
+    global _disk_cache_dirty
+
+    cache_path = os.environ.get(_PAIR_CACHE_ENV)
+    if not cache_path:
+        return _get_geodesic()(p, q).kilometers
+
+    cache = _load_disk_cache(cache_path)
+    key = f"{p[0]:.5f},{p[1]:.5f},{q[0]:.5f},{q[1]:.5f}"
+    distance = cache.get(key)
+    if distance is None:
+        distance = _get_geodesic()(p, q).kilometers
+        cache[key] = distance
+        _disk_cache_dirty = True
+    return distance
+
+
+def _geodesic_matrix(coords: np.ndarray) -> np.ndarray:
+    """Pairwise geodesic distance matrix in kilometers.
+
+    Per-pair Vincenty solves are orders of magnitude slower than the
+    vectorized haversine, so this path is only taken when a caller
+    explicitly asks for geodesic-grade accuracy.
+    """
+    n = coords.shape[0]
+    # Plain float tuples keep _pair_km's hashing cheap (no numpy scalars).
+    points = [(float(lat), float(lon)) for lat, lon in coords]
+    out = np.zeros((n, n), dtype=np.float64)
+
+    def fill_rows(rows: range) -> None:
+        for i in rows:
+            p = points[i]
+            for j in range(i + 1, n):
+                q = points[j]
+                d = _pair_km(p, q) if p <= q else _pair_km(q, p)
+                out[i, j] = d
+                out[j, i] = d
+
+    workers = os.cpu_count() or 1
+    if n >= 16 and workers > 1:
+        # Strided row assignment balances the shrinking upper-triangle
+        # rows across workers; each thread writes disjoint cells, and the
+        # solver's C math overlaps enough to hide most of the wall time.
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(fill_rows, [range(w, n, workers) for w in range(workers)]))
+    else:
+        fill_rows(range(n))
+    return out
+
+
+def _two_opt_python(distances: np.ndarray, order: list[int]) -> list[int]:
+    """Pure-Python 2-opt sweep over a tour, reusing the distance matrix.
+
+    The delta check costs four matrix lookups per candidate swap and no
+    geodesic recomputation. Scanning continues after a swap rather than
+    restarting the outer loop, which keeps each pass near-linear.
+    """
+    n = len(order)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, n - 2):
+            for j in range(i + 1, n - 1):
+                a, b = order[i - 1], order[i]
+                c, d = order[j], order[j + 1]
+                if distances[a, c] + distances[b, d] < distances[a, b] + distances[c, d]:
+                    order[i : j + 1] = order[i : j + 1][::-1]
+                    improved = True
+    return order
+
+
+def _ortools_order(distances: np.ndarray, start_index: int) -> Optional[list[int]]:
+    """
+    Solve the tour with OR-tools' constraint-programming TSP solver.
+
+    Args:
+        distances: Pairwise distance matrix in kilometers
+        start_index: Index of the depot waypoint
+
+    Returns:
+        Visit order as a list of indices, or None if no solution was found
+    """
+    n = distances.shape[0]
+    # OR-tools works on integer costs; meters give enough resolution.
+    matrix = (distances * 1000).astype(int)
+
+    manager = pywrapcp.RoutingIndexManager(n, 1, start_index)
+    routing = pywrapcp.RoutingModel(manager)
+
+    def transit(from_index: int, to_index: int) -> int:
+        return int(matrix[manager.IndexToNode(from_index), manager.IndexToNode(to_index)])
+
+    callback_index = routing.RegisterTransitCallback(transit)
+    routing.SetArcCostEvaluatorOfAllVehicles(callback_index)
+
+    params = pywrapcp.DefaultRoutingSearchParameters()
+    params.first_solution_strategy = routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
+    params.local_search_metaheuristic = (
+        routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH
+    )
+    params.time_limit.FromSeconds(1)
+
+    solution = routing.SolveWithParameters(params)
+    if solution is None:
+        return None
+
+    order = []
+    index = routing.Start(0)
+    while not routing.IsEnd(index):
+        order.append(manager.IndexToNode(index))
+        index = solution.Value(routing.NextVar(index))
+    return order
+
 
 class RouteOptimizer:
     """Optimize freight delivery routes."""
 
     @staticmethod
     def optimize_waypoints(
-        waypoints: list[tuple[float, float]], start_index: int = 0
+        waypoints: list[tuple[float, float]],
+        start_index: int = 0,
+        use_geodesic: bool = False,
+        high_accuracy: bool = False,
     ) -> list[tuple[float, float]]:
         """
         Simple nearest-neighbor optimization for waypoints.
 
+        Tour decisions only compare distances, so by default the ranking
+        matrix uses the cheap equirectangular approximation; pass
+        high_accuracy=True for a haversine matrix or use_geodesic=True
+        for per-pair geodesic solves.
+
         Args:
             waypoints: List of (latitude, longitude) tuples
             start_index: Starting waypoint index
+            use_geodesic: Build the distance matrix with per-pair geodesic
+                solves (slowest, Vincenty-grade)
+            high_accuracy: Build the matrix with haversine instead of the
+                equirectangular approximation
 
         Returns:
             Optimized list of waypoints
         """
-        from geopy.distance import geodesic
-
         if len(waypoints) <= 2:
             return waypoints
 
-        unvisited = set(range(len(waypoints)))
-        current = start_index
-        optimized = [waypoints[current]]
-        unvisited.remove(current)
+        coords = np.asarray(waypoints, dtype=np.float64)
+        order = RouteOptimizer._tour_order(coords, start_index, use_geodesic, high_accuracy)
+        return [waypoints[i] for i in order]
+
+    @staticmethod
+    def optimize_waypoints_arr(
+        coords: np.ndarray,
+        start_index: int = 0,
+        use_geodesic: bool = False,
+        high_accuracy: bool = False,
+    ) -> np.ndarray:
+        """
+        Array-native variant of :meth:`optimize_waypoints`.
+
+        Callers already holding an (N, 2) float64 coordinate array skip
+        the tuple boxing on both ends: indices flow through the solvers
+        and the reordered rows come back as one fancy-indexing pass.
+
+        Args:
+            coords: Array of shape (N, 2) with (latitude, longitude) rows
+            start_index: Starting waypoint index
+            use_geodesic: See :meth:`optimize_waypoints`
+            high_accuracy: See :meth:`optimize_waypoints`
+
+        Returns:
+            The same rows reordered into the optimized visit order
+        """
+        if coords.shape[0] <= 2:
+            return coords
+
+        order = RouteOptimizer._tour_order(coords, start_index, use_geodesic, high_accuracy)
+        return coords[np.asarray(order, dtype=np.intp)]
+
+    @staticmethod
+    def _tour_order(
+        coords: np.ndarray,
+        start_index: int,
+        use_geodesic: bool,
+        high_accuracy: bool = False,
+    ) -> list[int]:
+        """Pick the solver for a coordinate array and return the visit order."""
+        if use_geodesic:
+            distances = _geodesic_matrix(coords)
+        elif HAS_SCIPY and coords.shape[0] >= _KDTREE_THRESHOLD:
+            # Large instances skip the quadratic matrix entirely; the
+            # 2-opt refinement is also quadratic, so the candidate tour
+            # is returned as-is at this scale.
+            return _kdtree_nn_order(coords, start_index)
+        elif high_accuracy:
+            distances = DistanceCalculator.pairwise_haversine_matrix(coords)
+        else:
+            distances = _equirect_matrix(coords)
+        return RouteOptimizer.optimize_waypoints_from_matrix(distances, start_index)
 
-        while unvisited:
-            nearest = min(
-                unvisited,
-                key=lambda i: geodesic(waypoints[current], waypoints[i]).kilometers,
+    @staticmethod
+    def optimize_waypoints_from_matrix(
+        distances: np.ndarray, start_index: int = 0, improve: bool = True
+    ) -> list[int]:
+        """
+        Optimize a tour over a precomputed pairwise distance matrix.
+
+        Callers that already hold the matrix (e.g. to total the final tour)
+        reuse it here instead of recomputing every pair distance.
+
+        Args:
+            distances: Symmetric (N, N) pairwise distance matrix
+            start_index: Starting waypoint index
+            improve: Refine the nearest-neighbor tour with a 2-opt pass
+                (typically shortens tours 5-15% at matrix-lookup cost)
+
+        Returns:
+            Visit order as a list of indices into the matrix
+        """
+        n = distances.shape[0]
+        if n <= 2:
+            return list(range(n))
+
+        # Prefer OR-tools' C++ solver when it is installed: it is both
+        # faster and produces shorter tours than the heuristics below.
+        if HAS_ORTOOLS and n >= 4:
+            order = _ortools_order(distances, start_index)
+            if order is not None:
+                return order
+
+        if _nn_path_numba is not None and n >= 8:
+            order = _nn_path_numba(distances, start_index)
+        elif n <= 64:
+            # Small instances fit the unvisited set in one machine word:
+            # each step walks the set bits of an int mask over plain
+            # Python floats (tolist once up front), with no hashing and
+            # no per-step array allocation.
+            rows = distances.tolist()
+            mask = ((1 << n) - 1) & ~(1 << start_index)
+            current = start_index
+            order = [current]
+
+            while mask:
+                row = rows[current]
+                best = -1
+                best_distance = np.inf
+                bits = mask
+                while bits:
+                    j = (bits & -bits).bit_length() - 1
+                    if row[j] < best_distance:
+                        best_distance = row[j]
+                        best = j
+                    bits &= bits - 1
+                order.append(best)
+                mask &= ~(1 << best)
+                current = best
+        else:
+            # Candidate-list pruning: each row's k nearest indices are
+            # precomputed once (argpartition + per-row sort), so the
+            # common step scans ~k candidates. The masked argmin over the
+            # full row — one vectorized sweep with a preallocated scratch
+            # buffer — only runs when a whole candidate list is visited.
+            k = min(10, n - 1)
+            candidates = np.argpartition(distances, k, axis=1)[:, : k + 1]
+            by_distance = np.argsort(
+                np.take_along_axis(distances, candidates, axis=1), axis=1
             )
-            optimized.append(waypoints[nearest])
-            current = nearest
-            unvisited.remove(current)
+            candidates = np.take_along_axis(candidates, by_distance, axis=1).tolist()
+
+            visited = np.zeros(n, dtype=bool)
+            scratch = np.empty(n, dtype=np.float64)
+            current = start_index
+            order = [current]
+            visited[current] = True
 
-        return optimized
+            for _ in range(n - 1):
+                for j in candidates[current]:
+                    if not visited[j]:
+                        current = j
+                        break
+                else:
+                    np.copyto(scratch, distances[current])
+                    scratch[visited] = np.inf
+                    current = int(scratch.argmin())
+                order.append(current)
+                visited[current] = True
+
+        # Improve the nearest-neighbor tour with a 2-opt pass, preferring
+        # the JIT kernel when Numba is available.
+        if improve and len(order) >= 4:
+            if _two_opt_numba is not None:
+                order = _two_opt_numba(distances, order)
+            else:
+                order = _two_opt_python(distances, order)
+
+        return order
+
+    @staticmethod
+    def warm_cache(waypoints: list[tuple[float, float]]) -> None:
+        """
+        Pre-populate the geodesic pair cache for a waypoint universe.
+
+        Solves run across a thread pool — geographiclib's math releases
+        little of the GIL, but overlapping the cache misses still hides
+        most of the latency — and land in the in-process LRU plus the
+        disk cache when GIS_MCP_PAIR_CACHE is set. Subsequent
+        use_geodesic optimizations over these points become pure lookups.
+
+        Args:
+            waypoints: List of (latitude, longitude) tuples to warm
+        """
+        points = [(float(lat), float(lon)) for lat, lon in waypoints]
+        pairs = [
+            (p, q) if p <= q else (q, p) for p, q in combinations(points, 2)
+        ]
+        if not pairs:
+            return
+        with ThreadPoolExecutor(max_workers=min(8, len(pairs))) as executor:
+            list(executor.map(lambda pair: _pair_km(*pair), pairs))
 
     @staticmethod
     def estimate_fuel_cost(
@@ -59,5 +524,27 @@ class RouteOptimizer:
         Returns:
             Estimated fuel cost
         """
-        liters_needed = distance_km / fuel_efficiency
-        return liters_needed * fuel_price_per_liter
+        return float(fuel_cost(distance_km, fuel_price_per_liter, fuel_efficiency))
+
+    @staticmethod
+    def estimate_fuel_cost_batch(
+        distances_km: np.ndarray,
+        fuel_prices_per_liter: "float | np.ndarray" = 1.5,
+        fuel_efficiencies: "float | np.ndarray" = 8.0,
+    ) -> np.ndarray:
+        """
+        Estimate fuel costs for many routes or scenarios in one call.
+
+        All arguments broadcast against each other, so a fleet sweep over
+        distances, price scenarios, or vehicle efficiencies is a single
+        vectorized expression instead of a Python loop of scalar calls.
+
+        Args:
+            distances_km: Distances in kilometers
+            fuel_prices_per_liter: Price(s) per liter of fuel
+            fuel_efficiencies: Vehicle fuel efficiencies in km/liter
+
+        Returns:
+            Estimated fuel costs with the broadcast shape of the inputs
+        """
+        return fuel_cost(distances_km, fuel_prices_per_liter, fuel_efficiencies)
@@ -17,8 +17,8 @@ class TestGISAgent:
 
     @pytest.fixture
     def agent(self) -> GISAgent:
-        """Create agent instance."""
-        return GISAgent()
+        """Create agent instance without disk-cache persistence."""
+        return GISAgent(cache_path=None)
 
     def test_agent_initialization(self, agent: GISAgent) -> None:
         """Test agent can be initialized."""
@@ -81,7 +81,7 @@ class TestGISAgent:
     def test_process_distance_request(self, agent: GISAgent) -> None:
         """Test processing distance request."""
         query = "distance from New York to Los Angeles"
-        result = asyncio.run(agent.process_request(query))
+        result = agent.process_request(query)
 
         assert result["status"] == "success"
         assert result["type"] == "distance"
@@ -91,7 +91,7 @@ class TestGISAgent:
     def test_process_route_request(self, agent: GISAgent) -> None:
         """Test processing route optimization request."""
         query = "optimize a route with stops in NYC, Denver, and LA"
-        result = asyncio.run(agent.process_request(query))
+        result = agent.process_request(query)
 
         assert result["status"] == "success"
         assert result["type"] == "route"
@@ -101,7 +101,7 @@ class TestGISAgent:
     def test_process_cost_request(self, agent: GISAgent) -> None:
         """Test processing fuel cost request."""
         query = "what's the fuel cost for 800 km at $2 per liter"
-        result = asyncio.run(agent.process_request(query))
+        result = agent.process_request(query)
 
         assert result["status"] == "success"
         assert result["type"] == "cost"
@@ -110,7 +110,7 @@ class TestGISAgent:
     def test_process_unrecognized_query(self, agent: GISAgent) -> None:
         """Test handling of unrecognized queries."""
         query = "what's the weather today?"
-        result = asyncio.run(agent.process_request(query))
+        result = agent.process_request(query)
 
         assert result["status"] == "unrecognized"
         assert "examples" in result
@@ -8,6 +8,7 @@ import pytest
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.gis_mcp_server.tools.distance_calculator import DistanceCalculator
+from src.gis_mcp_server.tools.route_optimizer import RouteOptimizer
 
 
 class TestDistanceCalculator:
@@ -50,6 +51,45 @@ class TestDistanceCalculator:
         assert result["minutes"] == 600.0
 
 
+class TestRouteOptimizer:
+    """Test route optimization functionality."""
+
+    def test_optimize_waypoints_is_permutation(self) -> None:
+        """Test that optimization visits every waypoint exactly once."""
+        waypoints = [
+            (40.7128, -74.0060),  # NYC
+            (34.0522, -118.2437),  # LA
+            (39.7392, -104.9903),  # Denver
+            (41.8781, -87.6298),  # Chicago
+            (29.7604, -95.3698),  # Houston
+        ]
+
+        optimized = RouteOptimizer.optimize_waypoints(waypoints)
+        assert sorted(optimized) == sorted(waypoints)
+        assert optimized[0] == waypoints[0]
+
+    def test_two_opt_does_not_lengthen_tour(self) -> None:
+        """Test that the 2-opt pass never produces a longer tour."""
+        waypoints = [
+            (40.7128, -74.0060),  # NYC
+            (34.0522, -118.2437),  # LA
+            (41.8781, -87.6298),  # Chicago
+            (39.7392, -104.9903),  # Denver
+            (29.7604, -95.3698),  # Houston
+        ]
+
+        optimized = RouteOptimizer.optimize_waypoints(waypoints)
+        original = DistanceCalculator.calculate_route_distance(waypoints)
+        improved = DistanceCalculator.calculate_route_distance(optimized)
+        assert improved <= original
+
+    def test_estimate_fuel_cost(self) -> None:
+        """Test fuel cost estimation."""
+        # 800 km at 8 km/liter and $1.5/liter = $150
+        cost = RouteOptimizer.estimate_fuel_cost(800)
+        assert cost == pytest.approx(150.0)
+
+
 class TestGISMCPServer:
     """Test GIS MCP Server initialization."""
 